@@ -6,11 +6,18 @@ Author: Cardsea
 
 import sys
 import os
+import glob
+import functools
 import subprocess
+import signal
 import threading
-import json
+import queue
+import shutil
+import tempfile
+import uuid
+from collections import OrderedDict, deque
 from pathlib import Path
-from PIL import Image, ImageTk
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import io
 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
@@ -18,204 +25,759 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                              QMessageBox, QTextEdit, QGroupBox, QGridLayout, QDial,
                              QSlider, QSpinBox, QComboBox, QTabWidget, QCheckBox,
                              QListWidget, QListWidgetItem, QSplitter)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QPalette, QColor, QIcon, QPixmap
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal, QTimer
+from PyQt5.QtGui import QFont, QPalette, QColor, QIcon, QPixmap, QImageReader
 
-class CompressionWorker(QThread):
+THUMB_CACHE_SIZE = 64  # Scaled preview pixmaps kept by the image tab
+
+# Dark theme, applied application-wide by MediaCompressor
+_DARK_QSS = """
+    QMainWindow {
+        background-color: #2b2b2b;
+        color: #ffffff;
+    }
+    QTabWidget::pane {
+        border: 1px solid #555555;
+        background-color: #2b2b2b;
+    }
+    QTabWidget::tab-bar {
+        alignment: center;
+    }
+    QTabBar::tab {
+        background-color: #404040;
+        color: #ffffff;
+        padding: 12px 24px;
+        margin-right: 2px;
+        border-top-left-radius: 8px;
+        border-top-right-radius: 8px;
+    }
+    QTabBar::tab:selected {
+        background-color: #4CAF50;
+    }
+    QTabBar::tab:hover {
+        background-color: #555555;
+    }
+    QGroupBox {
+        font-weight: bold;
+        border: 2px solid #555555;
+        border-radius: 5px;
+        margin-top: 1ex;
+        padding-top: 15px;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px 0 5px;
+    }
+    QPushButton {
+        background-color: #4CAF50;
+        border: none;
+        color: white;
+        padding: 8px 16px;
+        border-radius: 4px;
+        font-size: 14px;
+    }
+    QPushButton:hover {
+        background-color: #45a049;
+    }
+    QPushButton:pressed {
+        background-color: #3d8b40;
+    }
+    QPushButton:disabled {
+        background-color: #666666;
+        color: #999999;
+    }
+    QLabel {
+        color: #ffffff;
+    }
+    QProgressBar {
+        border: 2px solid #555555;
+        border-radius: 5px;
+        text-align: center;
+    }
+    QProgressBar::chunk {
+        background-color: #4CAF50;
+        border-radius: 3px;
+    }
+    QListWidget {
+        background-color: #404040;
+        border: 1px solid #555555;
+        border-radius: 4px;
+        color: #ffffff;
+    }
+    QListWidget::item {
+        padding: 4px;
+        border-bottom: 1px solid #555555;
+    }
+    QListWidget::item:selected {
+        background-color: #4CAF50;
+    }
+    QMessageBox {
+        background-color: #2b2b2b;
+    }
+    QLabel#subtitle {
+        color: #cccccc;
+        margin-bottom: 20px;
+    }
+    QLabel#preview {
+        border: 1px solid #555555;
+        border-radius: 8px;
+    }
+"""
+
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+def format_size(bytes_size):
+    """Format file size in human readable format"""
+    if bytes_size < 1024:
+        return f"{bytes_size} B"
+    # Each unit step is 10 bits, so the bit length picks the unit without a loop
+    index = min((bytes_size.bit_length() - 1) // 10, len(_UNITS) - 1)
+    return f"{bytes_size / (1 << index * 10):.1f} {_UNITS[index]}"
+
+# Quality preset combo labels and the x264 preset names they select
+QUALITY_PRESETS = [
+    ("Ultra Fast", "ultrafast"),
+    ("Super Fast", "superfast"),
+    ("Very Fast", "veryfast"),
+    ("Faster", "faster"),
+    ("Fast", "fast"),
+    ("Medium", "medium"),
+    ("Slow", "slow"),
+    ("Slower", "slower"),
+    ("Very Slow", "veryslow"),
+]
+
+# Hardware H.264 encoders, best first, with their Encoder combo labels
+HW_ENCODERS = [
+    ('h264_videotoolbox', "VideoToolbox (Apple)"),
+    ('h264_nvenc', "NVENC (NVIDIA)"),
+    ('h264_qsv', "Quick Sync (Intel)"),
+    ('h264_vaapi', "VAAPI (Linux)"),
+]
+
+# x264 preset names translated for encoders that use their own scales
+NVENC_PRESETS = {
+    'ultrafast': 'p1', 'superfast': 'p1', 'veryfast': 'p2', 'faster': 'p3', 'fast': 'p3',
+    'medium': 'p4', 'slow': 'p5', 'slower': 'p6', 'veryslow': 'p7'
+}
+QSV_PRESETS = {'ultrafast': 'veryfast', 'superfast': 'veryfast'}  # The rest share x264's names
+
+# Cheaper motion search and fewer references: roughly 1.5-2x faster for a small quality cost
+X264_SPEED_PARAMS = 'ref=2:bframes=2:me=hex:subme=6:rc-lookahead=20:aq-mode=1:trellis=1'
+
+def _vaapi_device():
+    """Get the first DRI render node for VAAPI encoding"""
+    nodes = sorted(glob.glob('/dev/dri/renderD*'))
+    return nodes[0] if nodes else '/dev/dri/renderD128'
+
+def _hw_input_args(encoder):
+    """Get the arguments a hardware encoder needs ahead of -i"""
+    if encoder == 'h264_vaapi':
+        return ['-vaapi_device', _vaapi_device()]
+    return []
+
+def _hw_candidates():
+    """List the hardware encoders this platform could offer, without starting ffmpeg"""
+    candidates = []
+    if sys.platform == 'darwin':
+        candidates.append('h264_videotoolbox')
+    if os.name == 'nt' or glob.glob('/dev/nvidia*'):
+        candidates.append('h264_nvenc')
+    if os.name == 'nt' or glob.glob('/dev/dri/renderD*'):
+        candidates.append('h264_qsv')
+    if sys.platform.startswith('linux') and glob.glob('/dev/dri/renderD*'):
+        candidates.append('h264_vaapi')
+    return candidates
+
+def _encoder_works(encoder):
+    """Check that ffmpeg can actually open an encoder by encoding a single test frame"""
+    cmd = ['ffmpeg', '-hide_banner', '-v', 'error'] + _hw_input_args(encoder) + [
+        '-f', 'lavfi', '-i', 'color=size=256x256:rate=1'
+    ]
+    if encoder == 'h264_vaapi':
+        cmd += ['-vf', 'format=nv12,hwupload']
+    cmd += ['-frames:v', '1', '-c:v', encoder, '-f', 'null', '-']
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=15).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_available():
+    """Check once whether ffmpeg is on PATH"""
+    return shutil.which('ffmpeg') is not None
+
+@functools.lru_cache(maxsize=1)
+def detect_hwenc():
+    """Detect the best hardware H.264 encoder available, or None to use libx264"""
+    candidates = _hw_candidates()
+    if not candidates:
+        return None
+        
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True)
+    except OSError:
+        return None
+        
+    # Builds often list encoders the hardware can't run, so confirm with a test frame
+    listed = result.stdout.split()
+    for encoder in candidates:
+        if encoder in listed and _encoder_works(encoder):
+            return encoder
+    return None
+
+_turbojpeg = None
+
+def _get_turbojpeg():
+    """Get this process's cached TurboJPEG encoder when Pillow isn't built on libjpeg-turbo"""
+    global _turbojpeg
+    if _turbojpeg is None:
+        _turbojpeg = False
+        from PIL import features
+        if not features.check_feature('libjpeg_turbo'):
+            try:
+                from turbojpeg import TurboJPEG
+                _turbojpeg = TurboJPEG()
+            except ImportError:
+                pass  # PyTurboJPEG isn't installed
+            except (OSError, RuntimeError):
+                pass  # libturbojpeg shared library not found
+    return _turbojpeg or None
+
+# Runs inside a worker process, so it must stay a picklable module-level function
+def _compress_one(input_file, output_file, quality, max_size=None):
+    """Compress a single image using PIL and return (original_size, compressed_size)"""
+    from PIL import Image
+    
+    original_size = os.path.getsize(input_file)
+    with Image.open(input_file) as img:
+        # Composite onto white only when the image actually has transparency
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        if has_alpha:
+            if img.mode != 'RGBA':
+                img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        # Shrink to fit before encoding so the encoder only sees the pixels we keep
+        if max_size:
+            img.thumbnail(max_size, Image.LANCZOS)
+        
+        # Determine output format and quality
+        output_path = Path(output_file)
+        if output_path.suffix.lower() in ['.jpg', '.jpeg']:
+            format_type = 'JPEG'
+            quality = min(100, max(10, int(quality)))
+        else:
+            format_type = 'PNG'
+            quality = 95  # PNG doesn't use quality in the same way
+        
+        # Save compressed image (both encoders below release the GIL while encoding)
+        save_kwargs = {'format': format_type, 'optimize': True}
+        if format_type == 'JPEG':
+            save_kwargs['quality'] = quality
+        
+        # Encode in memory so the output size is known without stat'ing the new file
+        turbojpeg = _get_turbojpeg() if format_type == 'JPEG' else None
+        if turbojpeg:
+            import numpy as np
+            from turbojpeg import TJPF_RGB, TJSAMP_420
+            
+            # Encode straight through libjpeg-turbo's SIMD pipeline
+            data = turbojpeg.encode(np.asarray(img), quality=quality,
+                                    pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420)
+        else:
+            buffer = io.BytesIO()
+            img.save(buffer, **save_kwargs)
+            data = buffer.getbuffer()
+    
+    with open(output_file, 'wb') as f:
+        f.write(data)
+    
+    return original_size, len(data)
+
+def _signal_process_tree(process, force=False):
+    """Stop ffmpeg together with any helper processes it spawned"""
+    try:
+        if os.name == 'nt':
+            # ffmpeg spawns no children on Windows, and a console break event can't reach it
+            # from a console-less GUI, so just terminate the process itself
+            process.terminate()
+        else:
+            # ffmpeg leads its own session, so its pid is also the group id
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except OSError:
+        pass  # Already exited
+
+def _stop_process_tree(process, grace_seconds=2):
+    """Ask ffmpeg to stop, and force it down if it is still running after the grace period"""
+    _signal_process_tree(process)
+    # The deadline runs on its own thread: the job thread stays blocked reading
+    # progress until ffmpeg exits, so it can't enforce one itself
+    def force_after_grace():
+        try:
+            process.wait(timeout=grace_seconds)
+        except subprocess.TimeoutExpired:
+            _signal_process_tree(process, force=True)
+    threading.Thread(target=force_after_grace, daemon=True).start()
+
+def _scratch_path(output_file, expected_bytes):
+    """Get a path on RAM-backed /dev/shm for an output of about expected_bytes, or None"""
+    shm_dir = '/dev/shm'
+    if not (os.path.isdir(shm_dir) and os.access(shm_dir, os.W_OK)):
+        return None
+    # Leave headroom for overshoot; a full tmpfs would fail the encode outright
+    if shutil.disk_usage(shm_dir).free < 2 * expected_bytes:
+        return None
+    return os.path.join(shm_dir, f"{uuid.uuid4().hex}_{os.path.basename(output_file)}")
+
+_PROBE_CACHE = {}  # (path, mtime_ns, size) -> probe_media() result
+_PROBE_FIELDS = ('duration', 'width', 'height', 'fps', 'audio_codec', 'audio_bitrate')
+
+# Short-side sizes to step down to when the bitrate is spread too thin over the source pixels
+DOWNSCALE_HEIGHTS = (720, 540, 360)
+MIN_BITS_PER_PIXEL = 0.10  # Per pixel per frame; below this H.264 turns to mush
+
+FRAGMENTED_MP4_MAX_SECONDS = 120  # Shorter MP4/MOV outputs skip the faststart rewrite
+
+def probe_media(file_path):
+    """Read the duration and first video/audio stream details, raising if the duration can't be determined"""
+    try:
+        import av
+    except ImportError:
+        av = None
+        
+    # Read the container header in-process instead of spawning ffprobe
+    if av is not None:
+        with av.open(file_path, options={'probesize': '32k', 'analyzeduration': '0'}) as container:
+            if container.duration is not None:
+                info = dict.fromkeys(_PROBE_FIELDS)
+                info['duration'] = container.duration / av.time_base
+                if container.streams.video:
+                    video = container.streams.video[0]
+                    info['width'] = video.codec_context.width or None
+                    info['height'] = video.codec_context.height or None
+                    rate = video.average_rate or video.guessed_rate
+                    info['fps'] = float(rate) if rate else None
+                if container.streams.audio:
+                    audio = container.streams.audio[0]
+                    info['audio_codec'] = audio.codec_context.name
+                    info['audio_bitrate'] = audio.bit_rate or audio.codec_context.bit_rate or None
+                return info
+                
+    # Ask ffprobe for just the fields we use, one key=value|... line per section
+    cmd = [
+        'ffprobe', '-v', 'quiet',
+        '-probesize', '32k', '-analyzeduration', '0',  # Everything comes from the header
+        '-show_entries', 'format=duration:stream=codec_type,codec_name,bit_rate,width,height,avg_frame_rate,r_frame_rate',
+        '-of', 'compact=p=0',
+        file_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    info = dict.fromkeys(_PROBE_FIELDS)
+    for line in result.stdout.splitlines():
+        fields = dict(field.partition('=')[::2] for field in line.split('|'))
+        if 'duration' in fields:
+            info['duration'] = float(fields['duration'])
+        elif fields.get('codec_type') == 'video' and info['width'] is None:
+            if fields.get('width', '').isdigit() and fields.get('height', '').isdigit():
+                info['width'], info['height'] = int(fields['width']), int(fields['height'])
+            # Average rate first, like the PyAV path: for VFR sources r_frame_rate is often
+            # the timebase (e.g. 1000/1), so it's only used when ffprobe reports no average
+            for key in ('avg_frame_rate', 'r_frame_rate'):
+                num, _, den = fields.get(key, '').partition('/')
+                if num.isdigit() and den.isdigit() and int(num) and int(den):
+                    info['fps'] = int(num) / int(den)
+                    break
+        elif fields.get('codec_type') == 'audio' and info['audio_codec'] is None:
+            info['audio_codec'] = fields.get('codec_name')
+            if fields.get('bit_rate', '').isdigit():
+                info['audio_bitrate'] = int(fields['bit_rate'])
+    if info['duration'] is None:
+        raise ValueError("ffprobe did not report a duration")
+    return info
+
+def _downscale_height(info, video_kbps):
+    """Pick a smaller short-side size for a too-low bitrate, or None to keep the source size"""
+    width, height, fps = info['width'], info['height'], info['fps']
+    if not (width and height and fps):
+        return None
+    short_side = min(width, height)
+    pixel_rate = width * height * fps
+    candidates = [size for size in DOWNSCALE_HEIGHTS if size < short_side]
+    if not candidates or video_kbps * 1000 / pixel_rate >= MIN_BITS_PER_PIXEL:
+        return None
+    # Largest size that still gets enough bits per pixel, else the smallest we offer
+    for size in candidates:
+        if video_kbps * 1000 / (pixel_rate * (size / short_side) ** 2) >= MIN_BITS_PER_PIXEL:
+            return size
+    return candidates[-1]
+
+def _audio_plan(info):
+    """Pick the audio arguments and the audio bitrate (kbps) they spend"""
+    if info['audio_codec'] is None:
+        return ['-an'], 0
+    # Small AAC tracks are copied as-is: no re-encode, and their real size is known
+    if info['audio_codec'] == 'aac' and info['audio_bitrate'] and info['audio_bitrate'] <= 128000:
+        return ['-c:a', 'copy'], -(-info['audio_bitrate'] // 1000)
+    return ['-c:a', 'aac', '-b:a', '128k'], 128
+
+class WorkerSignals(QObject):
+    """Signals for pool jobs, which can't emit themselves since QRunnable isn't a QObject"""
     progress_updated = pyqtSignal(int)
     status_updated = pyqtSignal(str)
     compression_finished = pyqtSignal(bool, str)
-    
-    def __init__(self, input_file, output_file, target_size_mb, quality_preset, compression_type='video'):
+
+class CompressionJob(QRunnable):
+    def __init__(self, jobs, target_size_mb, quality_preset, thread_count=0, encoder=None, speed_optimize=False):
         super().__init__()
-        self.input_file = input_file
-        self.output_file = output_file
+        self.jobs = jobs  # List of (input_file, output_file) pairs
         self.target_size_mb = target_size_mb
-        self.quality_preset = quality_preset
-        self.compression_type = compression_type
+        self.quality_preset = quality_preset  # x264 preset name, e.g. 'medium'
+        self.thread_count = thread_count  # 0 lets the encoder decide
+        self.encoder = encoder  # None picks the best available automatically
+        self.speed_optimize = speed_optimize  # Trade a little quality for faster libx264 encodes
         self.is_cancelled = False
+        self.signals = WorkerSignals()
+        self.process = None
+        self.status_prefix = ""
         
     def cancel(self):
         self.is_cancelled = True
-        
-    def get_video_duration(self, file_path):
-        """Get video duration in seconds using ffprobe"""
-        try:
-            cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_format', file_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            data = json.loads(result.stdout)
-            return float(data['format']['duration'])
-        except Exception as e:
-            self.status_updated.emit(f"Error getting video duration: {str(e)}")
-            return None
+        # Stop ffmpeg right away so the blocked progress read returns immediately
+        process = self.process
+        if process is not None and process.poll() is None:
+            _stop_process_tree(process)
+        
+    def get_media_info(self, file_path):
+        """Get video duration and audio stream details using PyAV, or ffprobe if it isn't installed"""
+        # Re-compressing an unchanged file reuses the earlier probe
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_mtime_ns, stat.st_size)
+        if key not in _PROBE_CACHE:
+            _PROBE_CACHE[key] = probe_media(file_path)
+        return _PROBE_CACHE[key]
             
-    def calculate_bitrate(self, duration_seconds, target_size_mb):
+    def calculate_bitrate(self, duration_seconds, target_size_mb, audio_kbps=128):
         """Calculate target bitrate based on file size and duration"""
-        # Convert MB to bits and account for audio (assume ~128kbps)
+        # Convert MB to bits and leave room for the audio track
         target_bits = target_size_mb * 8 * 1024 * 1024
-        audio_bits = 128 * 1000 * duration_seconds  # 128kbps audio
+        audio_bits = audio_kbps * 1000 * duration_seconds
         video_bits = target_bits - audio_bits
         
         # Calculate video bitrate in kbps
         video_bitrate = max(100, int(video_bits / duration_seconds / 1000))
         return video_bitrate
         
-    def compress_video(self):
-        """Compress video using FFmpeg"""
-        try:
-            self.status_updated.emit("Analyzing video...")
-            
-            # Get video duration
-            duration = self.get_video_duration(self.input_file)
-            if duration is None:
-                self.compression_finished.emit(False, "Failed to analyze video")
-                return
+    def run_ffmpeg(self, cmd, duration, progress_start, progress_span):
+        """Run one ffmpeg pass and return (returncode, stderr), or None if cancelled"""
+        self.process = process = subprocess.Popen(
+            cmd, 
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.PIPE,
+            # Own session so cancel() can signal ffmpeg and its children together
+            start_new_session=(os.name == 'posix')
+        )
+        if self.is_cancelled:  # cancel() ran before the process was published
+            _stop_process_tree(process)
+        
+        # Drain stderr on a side thread so a full pipe buffer can't stall ffmpeg;
+        # only the tail is kept, as raw bytes, and decoded if the pass fails
+        stderr_tail = deque(maxlen=200)
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_tail.extend(process.stderr),
+            daemon=True
+        )
+        stderr_thread.start()
+        
+        # Parse key=value progress lines as ffmpeg emits them; this only wakes when ffmpeg writes
+        # The pipes stay binary: progress lines are plain ASCII key=value pairs
+        for line in process.stdout:
+            key, _, value = line.strip().partition(b'=')
+            if key == b'out_time_ms' and value.isdigit():
+                # out_time_ms is reported in microseconds
+                progress = min(int(value) / 1000000 / duration, 0.99)
+                self.signals.progress_updated.emit(int(progress_start + progress * progress_span))
                 
-            # Calculate target bitrate
-            target_bitrate = self.calculate_bitrate(duration, self.target_size_mb)
-            
-            self.status_updated.emit(f"Compressing video (target bitrate: {target_bitrate}kbps)...")
-            
-            # Quality presets
-            preset_map = {
-                "Ultra Fast": "ultrafast",
-                "Super Fast": "superfast", 
-                "Very Fast": "veryfast",
-                "Faster": "faster",
-                "Fast": "fast",
-                "Medium": "medium",
-                "Slow": "slow",
-                "Slower": "slower",
-                "Very Slow": "veryslow"
-            }
-            
-            # Build ffmpeg command
-            cmd = [
-                'ffmpeg', '-i', self.input_file,
+        process.wait()
+        stderr_thread.join()
+        self.process = None
+        
+        if self.is_cancelled:
+            return None
+        if process.returncode != 0:
+            return process.returncode, b''.join(stderr_tail).decode('utf-8', 'replace')
+        return process.returncode, ''
+        
+    def compress_video(self, input_file, output_file, info, progress_start, progress_span):
+        """Compress one video with FFmpeg; returns an error message, or None on success"""
+        duration = info['duration']
+        audio_args, audio_kbps = _audio_plan(info)
+        
+        # Calculate target bitrate
+        target_bitrate = self.calculate_bitrate(duration, self.target_size_mb, audio_kbps)
+        
+        preset = self.quality_preset or 'medium'
+        thread_count = self.thread_count or os.cpu_count() or 1
+        encoder = self.encoder or detect_hwenc() or 'libx264'
+        
+        # Average bitrate for the size target, with a VBV cap so peaks can't blow the budget
+        rate_args = [
+            '-b:v', f'{target_bitrate}k',
+            '-maxrate', f'{target_bitrate * 3 // 2}k',
+            '-bufsize', f'{target_bitrate * 2}k',
+        ]
+        
+        # Scale the short side down when the bitrate can't carry the full resolution;
+        # -2 keeps the other side even, as H.264 requires
+        filters = []
+        scaled_height = _downscale_height(info, target_bitrate)
+        if scaled_height:
+            filters.append(f"scale=w='if(gt(iw,ih),-2,{scaled_height})':h='if(gt(iw,ih),{scaled_height},-2)'")
+        
+        # Video encoder settings shared by every pass
+        encode_args = ['-threads', str(self.thread_count)]
+        if encoder == 'libx264':
+            encode_args += [
                 '-c:v', 'libx264',
-                '-preset', preset_map.get(self.quality_preset, 'medium'),
-                '-b:v', f'{target_bitrate}k',
-                '-c:a', 'aac',
-                '-b:a', '128k',
-                '-y',  # Overwrite output file
-                self.output_file
+                '-preset', preset,
             ]
-            
-            # Run ffmpeg with progress tracking
-            process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            
-            # Monitor progress (simplified - ffmpeg doesn't easily provide progress)
-            progress = 0
-            while process.poll() is None:
-                if self.is_cancelled:
-                    process.terminate()
-                    self.compression_finished.emit(False, "Compression cancelled")
-                    return
-                    
-                progress = min(progress + 2, 95)
-                self.progress_updated.emit(progress)
-                self.msleep(500)
-                
-            # Check if compression was successful
-            if process.returncode == 0:
-                self.progress_updated.emit(100)
-                self.status_updated.emit("Compression completed successfully!")
-                self.compression_finished.emit(True, f"Video compressed successfully!\nSaved to: {self.output_file}")
+            if preset == 'ultrafast':
+                encode_args += ['-tune', 'zerolatency']  # Also switches x264 to sliced threads
+            x264_params = f'lookahead-threads={max(1, thread_count // 4)}'
+            if self.speed_optimize:
+                x264_params += ':' + X264_SPEED_PARAMS
+            encode_args += rate_args + ['-x264-params', x264_params]
+        elif encoder == 'h264_nvenc':
+            encode_args += [
+                '-c:v', encoder,
+                '-preset', NVENC_PRESETS.get(preset, 'p4'),
+                '-tune', 'hq',
+                '-rc', 'vbr',
+            ] + rate_args
+        elif encoder == 'h264_qsv':
+            encode_args += ['-c:v', encoder, '-preset', QSV_PRESETS.get(preset, preset)] + rate_args
+        elif encoder == 'h264_vaapi':
+            # VAAPI encodes from GPU surfaces, so upload the decoded (and scaled) frames last
+            filters += ['format=nv12', 'hwupload']
+            encode_args += ['-c:v', encoder] + rate_args
+        else:
+            encode_args += ['-c:v', encoder] + rate_args
+        if filters:
+            encode_args += ['-vf', ','.join(filters)]
+        
+        # Make MP4/MOV output streamable straight away. Short clips are written fragmented,
+        # which needs no rewrite after encoding for a slightly larger file; longer ones
+        # get the moov atom moved up front
+        mux_args = []
+        if Path(output_file).suffix.lower() in ['.mp4', '.mov', '.m4v']:
+            if duration < FRAGMENTED_MP4_MAX_SECONDS:
+                mux_args = ['-movflags', '+frag_keyframe+empty_moov+default_base_moof']
             else:
-                stderr = process.stderr.read() if process.stderr else "Unknown error"
-                self.compression_finished.emit(False, f"Compression failed: {stderr}")
-                
-        except Exception as e:
-            self.compression_finished.emit(False, f"Error during compression: {str(e)}")
-    
-    def compress_image(self):
-        """Compress image using PIL"""
+                mux_args = ['-movflags', '+faststart']
+        
+        # Encode into RAM when possible; a faststart rewrite then never touches the disk.
+        # Size it from the bitrates actually used, since the 100 kbps video floor can push
+        # long clips well past the target size
+        expected_bytes = (target_bitrate + audio_kbps) * 1000 * duration / 8
+        work_file = _scratch_path(output_file, expected_bytes) or output_file
+        
+        passlog_dir = tempfile.mkdtemp(prefix='media_compressor_')
         try:
-            self.status_updated.emit("Loading image...")
-            self.progress_updated.emit(10)
-            
-            # Open image
-            with Image.open(self.input_file) as img:
-                self.status_updated.emit("Processing image...")
-                self.progress_updated.emit(30)
-                
-                # Convert RGBA to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                self.progress_updated.emit(50)
-                
-                # Determine output format and quality
-                output_path = Path(self.output_file)
-                if output_path.suffix.lower() in ['.jpg', '.jpeg']:
-                    format_type = 'JPEG'
-                    # Quality mapping: target_size_mb is actually quality percentage for images
-                    quality = min(100, max(10, int(self.target_size_mb)))
-                else:
-                    format_type = 'PNG'
-                    quality = 95  # PNG doesn't use quality in the same way
-                
-                self.status_updated.emit(f"Saving compressed image (quality: {quality}%)...")
-                self.progress_updated.emit(80)
-                
-                # Save compressed image
-                save_kwargs = {'format': format_type, 'optimize': True}
-                if format_type == 'JPEG':
-                    save_kwargs['quality'] = quality
+            output_args = audio_args + mux_args + [work_file]
+            if encoder == 'libx264':
+                # Two-pass encode: pass 1 only gathers rate statistics, pass 2 hits the target size
+                passlog_args = ['-passlogfile', os.path.join(passlog_dir, 'x264')]
+                passes = [
+                    # The null muxer discards packets without opening its output, so '-' never reaches stdout
+                    ['-pass', '1'] + passlog_args + ['-an', '-f', 'null', '-'],
+                    ['-pass', '2'] + passlog_args + output_args,
+                ]
+            else:
+                # Hardware encoders do their own rate control in a single pass
+                passes = [output_args]
                 
-                img.save(self.output_file, **save_kwargs)
+            for index, pass_args in enumerate(passes):
+                status = f"Compressing video with {encoder}"
+                if scaled_height:
+                    status += f" at {scaled_height}p"
+                if len(passes) > 1:
+                    status += f", pass {index + 1} of {len(passes)}"
+                self.signals.status_updated.emit(f"{self.status_prefix}{status} (target bitrate: {target_bitrate}kbps)...")
                 
-                self.progress_updated.emit(100)
-                self.status_updated.emit("Image compression completed!")
+                # Build ffmpeg command
+                # Stream analysis limits only take effect when placed before -i
+                cmd = [
+                    'ffmpeg', '-probesize', '1M', '-analyzeduration', '100000'
+                ] + _hw_input_args(encoder) + [
+                    '-i', input_file
+                ] + encode_args + [
+                    '-nostats', '-progress', 'pipe:1',  # Machine-readable progress on stdout
+                    '-loglevel', 'error',  # Keep stderr to the messages worth showing on failure
+                    '-y',  # Overwrite output file
+                ] + pass_args
                 
-                # Get file sizes for comparison
-                original_size = os.path.getsize(self.input_file)
-                compressed_size = os.path.getsize(self.output_file)
-                reduction = ((original_size - compressed_size) / original_size) * 100
+                # Each pass fills an equal share of this file's slice of the progress bar
+                span = progress_span / len(passes)
+                result = self.run_ffmpeg(cmd, duration, progress_start + index * span, span)
+                if result is None:
+                    return None
+                    
+                returncode, stderr = result
+                if returncode != 0:
+                    return f"Compression failed: {stderr or 'Unknown error'}"
+                    
+            if work_file != output_file:
+                self.signals.status_updated.emit(f"{self.status_prefix}Saving compressed video...")
+                shutil.move(work_file, output_file)
+        finally:
+            shutil.rmtree(passlog_dir, ignore_errors=True)
+            if work_file != output_file and os.path.exists(work_file):
+                os.remove(work_file)  # Cancelled or failed encode
+        return None
+        
+    def run(self):
+        """Encode the files in order while the next one is probed in the background"""
+        total = len(self.jobs)
+        failures = []
+        
+        # Producer: probe ahead so file k+1 is analyzed while file k is encoding
+        probed = queue.Queue()
+        def probe_ahead():
+            for input_file, output_file in self.jobs:
+                if self.is_cancelled:
+                    break
+                try:
+                    probed.put((input_file, output_file, self.get_media_info(input_file), None))
+                except Exception as e:
+                    probed.put((input_file, output_file, None, e))
+            probed.put(None)  # Wakes the encoder loop if the probes stopped early
+        threading.Thread(target=probe_ahead, daemon=True).start()
+        
+        self.signals.status_updated.emit("Analyzing video...")
+        self.signals.progress_updated.emit(0)
+        
+        for index in range(total):
+            item = probed.get()
+            if item is None or self.is_cancelled:
+                break
                 
-                self.compression_finished.emit(True, 
-                    f"Image compressed successfully!\n"
-                    f"Original: {self.format_size(original_size)}\n"
-                    f"Compressed: {self.format_size(compressed_size)}\n"
-                    f"Reduction: {reduction:.1f}%\n"
-                    f"Saved to: {self.output_file}")
+            input_file, output_file, info, error = item
+            name = os.path.basename(input_file)
+            if total > 1:
+                self.status_prefix = f"[{index + 1}/{total}] {name}: "
+            if error is not None or not info['duration']:
+                error = f"Failed to analyze video: {error or 'unknown duration'}"
+            else:
+                try:
+                    error = self.compress_video(input_file, output_file, info, index * 100 / total, 100 / total)
+                except Exception as e:
+                    error = f"Error during compression: {str(e)}"
+            if error is not None and not self.is_cancelled:
+                failures.append(error if total == 1 else f"{name}: {error}")
                 
-        except Exception as e:
-            self.compression_finished.emit(False, f"Error during image compression: {str(e)}")
-    
-    def format_size(self, bytes_size):
-        """Format file size in human readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if bytes_size < 1024.0:
-                return f"{bytes_size:.1f} {unit}"
-            bytes_size /= 1024.0
-        return f"{bytes_size:.1f} TB"
+        if self.is_cancelled:
+            self.signals.compression_finished.emit(False, "Compression cancelled")
+            return
+            
+        succeeded = total - len(failures)
+        if not succeeded:
+            self.signals.compression_finished.emit(False, "\n".join(failures))
+            return
+            
+        self.signals.progress_updated.emit(100)
+        self.signals.status_updated.emit("Compression completed successfully!")
+        if total == 1:
+            message = f"Video compressed successfully!\nSaved to: {self.jobs[0][1]}"
+        else:
+            message = f"{succeeded} of {total} videos compressed successfully!"
+            if failures:
+                message += "\n\nFailed:\n" + "\n".join(failures)
+        self.signals.compression_finished.emit(True, message)
+
+class ImageBatchJob(QRunnable):
+    def __init__(self, jobs, quality, max_size=None):
+        super().__init__()
+        self.jobs = jobs  # List of (input_file, output_file) pairs
+        self.quality = quality
+        self.max_size = max_size  # (max_width, max_height), or None to keep dimensions
+        self.is_cancelled = False
+        self.signals = WorkerSignals()
+        
+    def cancel(self):
+        self.is_cancelled = True
         
     def run(self):
-        if self.compression_type == 'video':
-            self.compress_video()
+        """Fan the images out across one process per CPU core"""
+        total = len(self.jobs)
+        original_total = 0
+        compressed_total = 0
+        failures = []
+        
+        self.signals.status_updated.emit(f"Compressing {total} image(s)...")
+        self.signals.progress_updated.emit(0)
+        
+        try:
+            with ProcessPoolExecutor(max_workers=min(total, os.cpu_count() or 1)) as executor:
+                futures = {
+                    executor.submit(_compress_one, input_file, output_file, self.quality, self.max_size): input_file
+                    for input_file, output_file in self.jobs
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    if self.is_cancelled:
+                        for pending in futures:
+                            pending.cancel()
+                        break
+                        
+                    try:
+                        original_size, compressed_size = future.result()
+                        original_total += original_size
+                        compressed_total += compressed_size
+                    except Exception as e:
+                        failures.append(f"{os.path.basename(futures[future])}: {str(e)}")
+                        
+                    self.signals.progress_updated.emit(int(done * 100 / total))
+                    self.signals.status_updated.emit(f"Compressed {done} of {total} image(s)...")
+        except Exception as e:
+            self.signals.compression_finished.emit(False, f"Error during image compression: {str(e)}")
+            return
+            
+        if self.is_cancelled:
+            self.signals.compression_finished.emit(False, "Compression cancelled")
+            return
+            
+        succeeded = total - len(failures)
+        if not succeeded:
+            self.signals.compression_finished.emit(False, "Error during image compression:\n" + "\n".join(failures))
+            return
+            
+        reduction = ((original_total - compressed_total) / original_total) * 100 if original_total else 0.0
+        if total == 1:
+            message = (f"Image compressed successfully!\n"
+                       f"Original: {format_size(original_total)}\n"
+                       f"Compressed: {format_size(compressed_total)}\n"
+                       f"Reduction: {reduction:.1f}%\n"
+                       f"Saved to: {self.jobs[0][1]}")
         else:
-            self.compress_image()
+            message = (f"{succeeded} of {total} images compressed successfully!\n"
+                       f"Original: {format_size(original_total)}\n"
+                       f"Compressed: {format_size(compressed_total)}\n"
+                       f"Reduction: {reduction:.1f}%")
+            if failures:
+                message += "\n\nFailed:\n" + "\n".join(failures)
+                
+        self.signals.status_updated.emit("Image compression completed!")
+        self.signals.compression_finished.emit(True, message)
 
 class VideoCompressorTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.input_file = ""
-        self.compression_worker = None
+        self.input_files = []
+        self.compression_job = None
         self.init_ui()
         
     def init_ui(self):
@@ -229,8 +791,8 @@ class VideoCompressorTab(QWidget):
         self.file_label.setWordWrap(True)
         file_layout.addWidget(self.file_label)
         
-        select_button = QPushButton("📁 Select Video File")
-        select_button.clicked.connect(self.select_file)
+        select_button = QPushButton("📁 Select Video Files")
+        select_button.clicked.connect(self.select_files)
         file_layout.addWidget(select_button)
         
         layout.addWidget(file_group)
@@ -246,6 +808,12 @@ class VideoCompressorTab(QWidget):
         # Create horizontal layout for size controls
         size_controls_layout = QHBoxLayout()
         
+        # Refresh the size label at most once per frame while the dial is dragged
+        self.size_label_timer = QTimer(self)
+        self.size_label_timer.setSingleShot(True)
+        self.size_label_timer.setInterval(16)
+        self.size_label_timer.timeout.connect(self.refresh_size_label)
+        
         # Size dial (1 MB to 1000 MB = 1 GB)
         self.size_dial = QDial()
         self.size_dial.setMinimum(1)
@@ -267,7 +835,7 @@ class VideoCompressorTab(QWidget):
         self.size_spinbox.setMaximum(1000)
         self.size_spinbox.setValue(100)
         self.size_spinbox.setSuffix(" MB")
-        self.size_spinbox.valueChanged.connect(self.sync_dial_from_spinbox)
+        self.size_spinbox.valueChanged.connect(self.update_size_from_spinbox)
         size_display_layout.addWidget(self.size_spinbox)
         
         size_controls_layout.addLayout(size_display_layout)
@@ -278,13 +846,39 @@ class VideoCompressorTab(QWidget):
         settings_layout.addWidget(quality_label, 1, 0)
         
         self.quality_combo = QComboBox()
-        self.quality_combo.addItems([
-            "Ultra Fast", "Super Fast", "Very Fast", "Faster", 
-            "Fast", "Medium", "Slow", "Slower", "Very Slow"
-        ])
+        for label, preset in QUALITY_PRESETS:
+            self.quality_combo.addItem(label, preset)
         self.quality_combo.setCurrentText("Medium")
         settings_layout.addWidget(self.quality_combo, 1, 1)
         
+        # Video encoder
+        encoder_label = QLabel("Encoder:")
+        settings_layout.addWidget(encoder_label, 2, 0)
+        
+        self.encoder_combo = QComboBox()
+        self.encoder_combo.addItem("Auto (best available)", None)
+        hw_labels = dict(HW_ENCODERS)
+        for encoder in _hw_candidates():
+            self.encoder_combo.addItem(hw_labels[encoder], encoder)
+        self.encoder_combo.addItem("libx264 (CPU)", 'libx264')
+        settings_layout.addWidget(self.encoder_combo, 2, 1)
+        
+        # Encoder thread count
+        threads_label = QLabel("CPU Threads:")
+        settings_layout.addWidget(threads_label, 3, 0)
+        
+        cpu_count = os.cpu_count() or 1
+        self.threads_spinbox = QSpinBox()
+        self.threads_spinbox.setMinimum(1)
+        self.threads_spinbox.setMaximum(2 * cpu_count)
+        self.threads_spinbox.setValue(cpu_count)
+        settings_layout.addWidget(self.threads_spinbox, 3, 1)
+        
+        # Faster libx264 settings; hardware encoders ignore this
+        self.speed_optimize_check = QCheckBox("Optimize for speed")
+        self.speed_optimize_check.setToolTip("Faster libx264 encodes at a small quality cost")
+        settings_layout.addWidget(self.speed_optimize_check, 4, 1)
+        
         layout.addWidget(settings_group)
         
         # Progress group
@@ -317,46 +911,66 @@ class VideoCompressorTab(QWidget):
         
     def update_size_display(self, value):
         """Update size display when dial changes"""
+        self.size_spinbox.blockSignals(True)
+        self.size_spinbox.setValue(value)
+        self.size_spinbox.blockSignals(False)
+        if not self.size_label_timer.isActive():
+            self.size_label_timer.start()
+            
+    def update_size_from_spinbox(self, value):
+        """Update size display when spinbox changes"""
+        self.size_dial.blockSignals(True)
+        self.size_dial.setValue(value)
+        self.size_dial.blockSignals(False)
+        if not self.size_label_timer.isActive():
+            self.size_label_timer.start()
+            
+    def refresh_size_label(self):
+        """Show the current target size on the size label"""
+        value = self.size_dial.value()
         if value >= 1000:
             display_text = "1.00 GB"
         else:
             display_text = f"{value} MB"
         self.size_display_label.setText(display_text)
-        self.size_spinbox.blockSignals(True)
-        self.size_spinbox.setValue(value)
-        self.size_spinbox.blockSignals(False)
         
-    def sync_dial_from_spinbox(self, value):
-        """Sync dial when spinbox changes"""
-        self.size_dial.setValue(value)
-        
-    def select_file(self):
-        """Open file dialog to select video file"""
-        file_path, _ = QFileDialog.getOpenFileName(
+    def select_files(self):
+        """Open file dialog to select one or more video files"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
-            "Select Video File",
+            "Select Video Files",
             "",
             "Video Files (*.mp4 *.avi *.mov *.mkv *.wmv *.flv *.webm *.m4v);;All Files (*)"
         )
         
-        if file_path:
-            self.input_file = file_path
-            self.file_label.setText(f"Selected: {os.path.basename(file_path)}")
+        if file_paths:
+            self.input_files = file_paths
+            if len(file_paths) == 1:
+                self.file_label.setText(f"Selected: {os.path.basename(file_paths[0])}")
+            else:
+                self.file_label.setText(f"Selected {len(file_paths)} files: "
+                                        + ", ".join(os.path.basename(path) for path in file_paths))
             self.compress_button.setEnabled(True)
             
     def start_compression(self):
-        """Start video compression in a separate thread"""
-        if not self.input_file:
+        """Start video compression for all selected files"""
+        if not self.input_files:
             QMessageBox.warning(self, "No File", "Please select a video file first!")
             return
             
-        # Get output file path
-        input_path = Path(self.input_file)
-        output_path = input_path.parent / f"{input_path.stem}_compressed{input_path.suffix}"
+        # Build an output path for every selected file
+        jobs = []
+        for input_file in self.input_files:
+            input_path = Path(input_file)
+            output_path = input_path.parent / f"{input_path.stem}_compressed{input_path.suffix}"
+            jobs.append((input_file, str(output_path)))
         
         # Get compression settings
         target_size_mb = self.size_dial.value()
-        quality_preset = self.quality_combo.currentText()
+        quality_preset = self.quality_combo.currentData()
+        thread_count = self.threads_spinbox.value()
+        encoder = self.encoder_combo.currentData()
+        speed_optimize = self.speed_optimize_check.isChecked()
         
         # Update UI
         self.compress_button.setEnabled(False)
@@ -364,19 +978,19 @@ class VideoCompressorTab(QWidget):
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         
-        # Start compression worker
-        self.compression_worker = CompressionWorker(
-            self.input_file, str(output_path), target_size_mb, quality_preset, 'video'
+        # Queue compression job on the shared thread pool
+        self.compression_job = CompressionJob(
+            jobs, target_size_mb, quality_preset, thread_count, encoder, speed_optimize
         )
-        self.compression_worker.progress_updated.connect(self.update_progress)
-        self.compression_worker.status_updated.connect(self.update_status)
-        self.compression_worker.compression_finished.connect(self.compression_finished)
-        self.compression_worker.start()
+        self.compression_job.signals.progress_updated.connect(self.update_progress)
+        self.compression_job.signals.status_updated.connect(self.update_status)
+        self.compression_job.signals.compression_finished.connect(self.compression_finished)
+        QThreadPool.globalInstance().start(self.compression_job)
         
     def cancel_compression(self):
         """Cancel ongoing compression"""
-        if self.compression_worker:
-            self.compression_worker.cancel()
+        if self.compression_job:
+            self.compression_job.cancel()
             
     def update_progress(self, value):
         """Update progress bar"""
@@ -399,13 +1013,14 @@ class VideoCompressorTab(QWidget):
             QMessageBox.critical(self, "Error", message)
             self.status_label.setText("Compression failed!")
             
-        self.compression_worker = None
+        self.compression_job = None
 
 class ImageCompressorTab(QWidget):
     def __init__(self):
         super().__init__()
         self.input_files = []
-        self.compression_worker = None
+        self.compression_job = None
+        self._thumb_cache = OrderedDict()  # (path, mtime, size) -> scaled QPixmap
         self.init_ui()
         
     def init_ui(self):
@@ -442,6 +1057,12 @@ class ImageCompressorTab(QWidget):
         
         quality_controls_layout = QHBoxLayout()
         
+        # Refresh the quality label at most once per frame while the dial is dragged
+        self.quality_label_timer = QTimer(self)
+        self.quality_label_timer.setSingleShot(True)
+        self.quality_label_timer.setInterval(16)
+        self.quality_label_timer.timeout.connect(self.refresh_quality_label)
+        
         self.quality_dial = QDial()
         self.quality_dial.setMinimum(10)
         self.quality_dial.setMaximum(100)
@@ -461,7 +1082,7 @@ class ImageCompressorTab(QWidget):
         self.quality_spinbox.setMaximum(100)
         self.quality_spinbox.setValue(80)
         self.quality_spinbox.setSuffix("%")
-        self.quality_spinbox.valueChanged.connect(self.sync_quality_dial_from_spinbox)
+        self.quality_spinbox.valueChanged.connect(self.update_quality_from_spinbox)
         quality_display_layout.addWidget(self.quality_spinbox)
         
         quality_controls_layout.addLayout(quality_display_layout)
@@ -538,7 +1159,7 @@ class ImageCompressorTab(QWidget):
         self.preview_label = QLabel("Select images to see preview")
         self.preview_label.setAlignment(Qt.AlignCenter)
         self.preview_label.setMinimumSize(300, 400)
-        self.preview_label.setStyleSheet("border: 1px solid #555555; border-radius: 8px;")
+        self.preview_label.setObjectName("preview")
         splitter.addWidget(self.preview_label)
         
         splitter.setSizes([500, 300])
@@ -547,14 +1168,23 @@ class ImageCompressorTab(QWidget):
         
     def update_quality_display(self, value):
         """Update quality display when dial changes"""
-        self.quality_display_label.setText(f"{value}%")
         self.quality_spinbox.blockSignals(True)
         self.quality_spinbox.setValue(value)
         self.quality_spinbox.blockSignals(False)
-        
-    def sync_quality_dial_from_spinbox(self, value):
-        """Sync dial when spinbox changes"""
+        if not self.quality_label_timer.isActive():
+            self.quality_label_timer.start()
+            
+    def update_quality_from_spinbox(self, value):
+        """Update quality display when spinbox changes"""
+        self.quality_dial.blockSignals(True)
         self.quality_dial.setValue(value)
+        self.quality_dial.blockSignals(False)
+        if not self.quality_label_timer.isActive():
+            self.quality_label_timer.start()
+            
+    def refresh_quality_label(self):
+        """Show the current quality on the quality label"""
+        self.quality_display_label.setText(f"{self.quality_dial.value()}%")
         
     def select_files(self):
         """Open file dialog to select image files"""
@@ -584,33 +1214,43 @@ class ImageCompressorTab(QWidget):
         if self.input_files:
             try:
                 first_image = self.input_files[0]
-                pixmap = QPixmap(first_image)
-                if not pixmap.isNull():
-                    # Scale pixmap to fit preview while maintaining aspect ratio
-                    scaled_pixmap = pixmap.scaled(280, 380, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    self.preview_label.setPixmap(scaled_pixmap)
-                    
-                    # Show image info
-                    file_size = os.path.getsize(first_image)
-                    size_text = self.format_size(file_size)
-                    self.preview_label.setText("")
-                    self.preview_label.setToolTip(f"{os.path.basename(first_image)}\nSize: {size_text}")
+                stat = os.stat(first_image)
+                key = (first_image, stat.st_mtime_ns, stat.st_size)
+                
+                # Reuse the cached thumbnail unless the file changed on disk
+                scaled_pixmap = self._thumb_cache.get(key)
+                if scaled_pixmap is not None:
+                    self._thumb_cache.move_to_end(key)
                 else:
-                    self.preview_label.setText("Cannot preview this image")
+                    # Decode straight to the preview size; JPEGs scale during the IDCT and
+                    # Qt area-averages whatever ratio is left in the same pass
+                    reader = QImageReader(first_image)
+                    size = reader.size()
+                    if size.isValid():
+                        reader.setScaledSize(size.scaled(280, 380, Qt.KeepAspectRatio))
+                    image = reader.read()
+                    if image.isNull():
+                        self.preview_label.setText("Cannot preview this image")
+                        return
+                    scaled_pixmap = QPixmap.fromImage(image)
+                    if not size.isValid():
+                        # Scale pixmap to fit preview while maintaining aspect ratio
+                        scaled_pixmap = scaled_pixmap.scaled(280, 380, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                    self._thumb_cache[key] = scaled_pixmap
+                    if len(self._thumb_cache) > THUMB_CACHE_SIZE:
+                        self._thumb_cache.popitem(last=False)
+                        
+                self.preview_label.setPixmap(scaled_pixmap)
+                
+                # Show image info
+                size_text = format_size(stat.st_size)
+                self.preview_label.setToolTip(f"{os.path.basename(first_image)}\nSize: {size_text}")
             except Exception as e:
                 self.preview_label.setText(f"Preview error: {str(e)}")
         else:
             self.preview_label.clear()
             self.preview_label.setText("Select images to see preview")
             
-    def format_size(self, bytes_size):
-        """Format file size in human readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if bytes_size < 1024.0:
-                return f"{bytes_size:.1f} {unit}"
-            bytes_size /= 1024.0
-        return f"{bytes_size:.1f} TB"
-            
     def clear_files(self):
         """Clear all selected files"""
         self.input_files = []
@@ -631,35 +1271,50 @@ class ImageCompressorTab(QWidget):
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         
-        # Process first file (for demo - in real app would process all)
-        first_file = self.input_files[0]
-        input_path = Path(first_file)
-        
-        # Determine output format
+        # Build an output path for every selected file
         format_choice = self.format_combo.currentText()
-        if "JPEG" in format_choice:
-            output_path = input_path.parent / f"{input_path.stem}_compressed.jpg"
-        elif "PNG" in format_choice:
-            output_path = input_path.parent / f"{input_path.stem}_compressed.png"
-        else:
-            output_path = input_path.parent / f"{input_path.stem}_compressed{input_path.suffix}"
+        jobs = []
+        # Lower-cased paths already spoken for, so case-insensitive filesystems can't collide either.
+        # Selected inputs count too: writing over one would race the process reading it
+        taken = {str(Path(input_file)).lower() for input_file in self.input_files}
+        for input_file in self.input_files:
+            input_path = Path(input_file)
+            if "JPEG" in format_choice:
+                output_path = input_path.parent / f"{input_path.stem}_compressed.jpg"
+            elif "PNG" in format_choice:
+                output_path = input_path.parent / f"{input_path.stem}_compressed.png"
+            else:
+                output_path = input_path.parent / f"{input_path.stem}_compressed{input_path.suffix}"
+                
+            # Converting c.png and c.jpg to one format would give both the same name;
+            # keep the source extension in the name, then count up if it still repeats
+            if str(output_path).lower() in taken:
+                source_ext = input_path.suffix.lstrip('.')
+                output_path = output_path.with_name(f"{input_path.stem}_{source_ext}_compressed{output_path.suffix}")
+            base_path, counter = output_path, 2
+            while str(output_path).lower() in taken:
+                output_path = base_path.with_name(f"{base_path.stem}_{counter}{base_path.suffix}")
+                counter += 1
+            taken.add(str(output_path).lower())
+            jobs.append((input_file, str(output_path)))
         
         # Get compression settings (quality for images)
         quality = self.quality_dial.value()
+        max_size = None
+        if self.resize_checkbox.isChecked():
+            max_size = (self.max_width_spinbox.value(), self.max_height_spinbox.value())
         
-        # Start compression worker
-        self.compression_worker = CompressionWorker(
-            first_file, str(output_path), quality, "", 'image'
-        )
-        self.compression_worker.progress_updated.connect(self.update_progress)
-        self.compression_worker.status_updated.connect(self.update_status)
-        self.compression_worker.compression_finished.connect(self.compression_finished)
-        self.compression_worker.start()
+        # Queue batch job, which dispatches the images to a process pool
+        self.compression_job = ImageBatchJob(jobs, quality, max_size)
+        self.compression_job.signals.progress_updated.connect(self.update_progress)
+        self.compression_job.signals.status_updated.connect(self.update_status)
+        self.compression_job.signals.compression_finished.connect(self.compression_finished)
+        QThreadPool.globalInstance().start(self.compression_job)
         
     def cancel_compression(self):
         """Cancel ongoing compression"""
-        if self.compression_worker:
-            self.compression_worker.cancel()
+        if self.compression_job:
+            self.compression_job.cancel()
             
     def update_progress(self, value):
         """Update progress bar"""
@@ -682,7 +1337,7 @@ class ImageCompressorTab(QWidget):
             QMessageBox.critical(self, "Error", message)
             self.status_label.setText("Compression failed!")
             
-        self.compression_worker = None
+        self.compression_job = None
 
 class MediaCompressor(QMainWindow):
     def __init__(self):
@@ -693,89 +1348,8 @@ class MediaCompressor(QMainWindow):
         self.setWindowTitle("Media Compressor Suite - by Cardsea")
         self.setGeometry(100, 100, 1000, 700)
         
-        # Set dark theme
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #2b2b2b;
-                color: #ffffff;
-            }
-            QTabWidget::pane {
-                border: 1px solid #555555;
-                background-color: #2b2b2b;
-            }
-            QTabWidget::tab-bar {
-                alignment: center;
-            }
-            QTabBar::tab {
-                background-color: #404040;
-                color: #ffffff;
-                padding: 12px 24px;
-                margin-right: 2px;
-                border-top-left-radius: 8px;
-                border-top-right-radius: 8px;
-            }
-            QTabBar::tab:selected {
-                background-color: #4CAF50;
-            }
-            QTabBar::tab:hover {
-                background-color: #555555;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #555555;
-                border-radius: 5px;
-                margin-top: 1ex;
-                padding-top: 15px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            QPushButton {
-                background-color: #4CAF50;
-                border: none;
-                color: white;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-            QPushButton:pressed {
-                background-color: #3d8b40;
-            }
-            QPushButton:disabled {
-                background-color: #666666;
-                color: #999999;
-            }
-            QLabel {
-                color: #ffffff;
-            }
-            QProgressBar {
-                border: 2px solid #555555;
-                border-radius: 5px;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #4CAF50;
-                border-radius: 3px;
-            }
-            QListWidget {
-                background-color: #404040;
-                border: 1px solid #555555;
-                border-radius: 4px;
-                color: #ffffff;
-            }
-            QListWidget::item {
-                padding: 4px;
-                border-bottom: 1px solid #555555;
-            }
-            QListWidget::item:selected {
-                background-color: #4CAF50;
-            }
-        """)
+        # Set dark theme once for the whole application so every widget shares it
+        QApplication.instance().setStyleSheet(_DARK_QSS)
         
         # Central widget with tabs
         central_widget = QWidget()
@@ -791,19 +1365,26 @@ class MediaCompressor(QMainWindow):
         
         subtitle_label = QLabel("Professional video and image compression tools - by Cardsea")
         subtitle_label.setAlignment(Qt.AlignCenter)
-        subtitle_label.setStyleSheet("color: #cccccc; margin-bottom: 20px;")
+        subtitle_label.setObjectName("subtitle")
         layout.addWidget(subtitle_label)
         
         # Create tab widget
         self.tab_widget = QTabWidget()
         
-        # Add video compressor tab
-        self.video_tab = VideoCompressorTab()
-        self.tab_widget.addTab(self.video_tab, "🎬 Video Compressor")
-        
-        # Add image compressor tab
-        self.image_tab = ImageCompressorTab()
-        self.tab_widget.addTab(self.image_tab, "🖼️ Image Compressor")
+        # Tabs start as empty containers and are built the first time they are shown
+        self.video_tab = None
+        self.image_tab = None
+        self._tab_builders = [
+            ('video_tab', VideoCompressorTab),
+            ('image_tab', ImageCompressorTab),
+        ]
+        for label in ("🎬 Video Compressor", "🖼️ Image Compressor"):
+            container = QWidget()
+            container_layout = QVBoxLayout(container)
+            container_layout.setContentsMargins(0, 0, 0, 0)
+            self.tab_widget.addTab(container, label)
+        self.tab_widget.currentChanged.connect(self.build_tab)
+        self.build_tab(self.tab_widget.currentIndex())
         
         layout.addWidget(self.tab_widget)
         
@@ -817,30 +1398,67 @@ class MediaCompressor(QMainWindow):
         )
         info_text.setReadOnly(True)
         layout.addWidget(info_text)
+        
+    def check_ffmpeg(self):
+        """Warn if ffmpeg is missing; image compression still works without it"""
+        if not _ffmpeg_available():
+            msg_box = QMessageBox(self)
+            msg_box.setIcon(QMessageBox.Warning)
+            msg_box.setWindowTitle("FFmpeg Not Found")
+            msg_box.setText("FFmpeg is not found on your system.")
+            msg_box.setInformativeText(
+                "Video compression requires FFmpeg. Image compression will still work.\n\n"
+                "To install FFmpeg:\n"
+                "macOS: brew install ffmpeg\n"
+                "Windows: Download from https://ffmpeg.org/\n"
+                "Linux: sudo apt install ffmpeg"
+            )
+            msg_box.exec_()
+        
+    def closeEvent(self, event):
+        """Cancel running jobs before closing so no encode keeps going without a window"""
+        jobs = [tab.compression_job for tab in (self.video_tab, self.image_tab)
+                if tab is not None and tab.compression_job is not None]
+        if jobs:
+            reply = QMessageBox.question(
+                self, "Compression Running",
+                "A compression is still running. Cancel it and quit?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                event.ignore()
+                return
+            for job in jobs:
+                job.signals.blockSignals(True)  # No result dialogs for a window that is going away
+                job.cancel()
+            # The pool's runnables would otherwise keep the process alive after the window closes
+            QThreadPool.globalInstance().waitForDone()
+        event.accept()
+        
+    def build_tab(self, index):
+        """Construct a tab's contents on its first visit"""
+        if index < 0:
+            return
+        attr, tab_class = self._tab_builders[index]
+        if getattr(self, attr) is not None:
+            return
+        tab = tab_class()
+        setattr(self, attr, tab)
+        self.tab_widget.widget(index).layout().addWidget(tab)
 
 def main():
     app = QApplication(sys.argv)
+    app.setStyle("Fusion")  # Consistent base style for the dark stylesheet on every platform
     
-    # Check if ffmpeg is available for video compression
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        msg_box = QMessageBox()
-        msg_box.setIcon(QMessageBox.Warning)
-        msg_box.setWindowTitle("FFmpeg Not Found")
-        msg_box.setText("FFmpeg is not found on your system.")
-        msg_box.setInformativeText(
-            "Video compression requires FFmpeg. Image compression will still work.\n\n"
-            "To install FFmpeg:\n"
-            "macOS: brew install ffmpeg\n"
-            "Windows: Download from https://ffmpeg.org/\n"
-            "Linux: sudo apt install ffmpeg"
-        )
-        msg_box.exec_()
+    # Compression jobs share one pool; ffmpeg and the image pool do their own threading
+    QThreadPool.globalInstance().setMaxThreadCount(max(2, (os.cpu_count() or 1) // 2))
     
     window = MediaCompressor()
     window.show()
     
+    # Check for ffmpeg once the event loop is running so it never delays the first paint
+    QTimer.singleShot(0, window.check_ffmpeg)
+    
     sys.exit(app.exec_())
 
 if __name__ == "__main__":